@@ -4,11 +4,13 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 
+import functools
+from typing import Callable
 import discord
 from dismob import log
 
 # List of known discord.py color names
-known_colors: set[str] = {
+known_colors: frozenset[str] = frozenset({
     'teal', 'dark_teal', 'brand_green', 'green', 'dark_green',
     'blue', 'dark_blue', 'purple', 'dark_purple', 'magenta',
     'dark_magenta', 'gold', 'dark_gold', 'orange', 'dark_orange',
@@ -16,28 +18,76 @@ known_colors: set[str] = {
     'dark_grey', 'dark_gray', 'light_grey', 'light_gray', 'darker_grey',
     'darker_gray', 'og_blurple', 'blurple', 'greyple', 'dark_theme',
     'fuchsia', 'yellow', 'dark_embed', 'light_embed', 'pink', 'dark_pink'
+})
+
+# Colour factories of the known colors, resolved once at import (skipping the ones missing from the installed discord.py)
+_COLOR_FUNCS: dict[str, Callable[[], discord.Colour]] = {
+    name: getattr(discord.Colour, name) for name in known_colors if hasattr(discord.Colour, name)
 }
 
-def str_to_color(color_str: str) -> discord.Colour:
+def _hex_nibbles(b: bytes, ones: int) -> int:
+    """
+    Decode every ASCII hex digit of `b` into its nibble value, kept in its own byte lane.
+    `ones` has a 0x01 in each lane. Returns -1 if any byte is not a hex digit.
+    """
+    v = int.from_bytes(b, "big")
+    lower = v | (ones * 0x20)
+    # The high bit of a lane is set when its byte is in [lo, hi]: (x + 0x80 - lo) & ~(x + 0x7F - hi)
+    digits = (v + ones * 0x50) & ~(v + ones * 0x46)          # '0'-'9'
+    letters = (lower + ones * 0x1F) & ~(lower + ones * 0x19)  # 'a'-'f' / 'A'-'F'
+    high = ones * 0x80
+    if (digits | letters) & high != high:
+        return -1
+    # Low 4 bits of the char, plus 9 for letters (bit 6 set)
+    return (v & (ones * 0x0F)) + ((v >> 6) & ones) * 9
+
+def _decode3(b: bytes) -> int:
+    nibbles = _hex_nibbles(b, 0x010101)
+    if nibbles < 0:
+        return -1
+    # Duplicate each nibble within its lane (e.g. "fff" -> 0xffffff)
+    return nibbles * 0x11
+
+def _decode6(b: bytes) -> int:
+    nibbles = _hex_nibbles(b, 0x010101010101)
+    if nibbles < 0:
+        return -1
+    # Merge each pair of lanes into one byte, then pack the 3 bytes together
+    pairs = ((nibbles >> 4) | nibbles) & 0x00FF00FF00FF
+    return ((pairs >> 16) & 0xFF0000) | ((pairs >> 8) & 0x00FF00) | (pairs & 0x0000FF)
+
+# Hex decoders indexed by the length of the code (without the leading '#')
+_HEX_DECODERS = {3: _decode3, 6: _decode6}
+
+# The underscore parameters are bound at definition time so they are read as locals, not globals
+@functools.lru_cache(maxsize=256)
+def _parse_color(
+    color_str: str,
+    _color_funcs: dict[str, Callable[[], discord.Colour]] = _COLOR_FUNCS,
+    _hex_decoders: dict[int, Callable[[bytes], int]] = _HEX_DECODERS
+) -> int | None:
+    """Returns the RGB value of the color string, or None if it isn't a valid one"""
     color_str = color_str.strip()
 
     # try named color
-    color_name = color_str.lower()
-    if color_name in known_colors:
-        func = getattr(discord.Colour, color_name)
-        return func()
+    func = _color_funcs.get(color_str.lower())
+    if func is not None:
+        return func().value
     
     # try hex code
-    try:
-        if color_str.startswith("#"):
-            color_str = color_str[1:]
-        if len(color_str) == 3:
-            # Expand 3-char hex to 6-char (e.g., "fff" -> "ffffff")
-            color_str = ''.join([c*2 for c in color_str])
-        if len(color_str) == 6:
-            return discord.Colour(int(color_str, 16))
-    except Exception:
-        pass
-
-    log.warning(f"Invalid color string '{color_str}', using default color (blurple).")
-    return discord.Colour.blurple()
+    if color_str[:1] == "#":
+        color_str = color_str[1:]
+    decoder = _hex_decoders.get(len(color_str))
+    if decoder is not None and color_str.isascii():
+        value = decoder(color_str.encode("ascii"))
+        if value >= 0:
+            return value
+    return None
+
+def str_to_color(color_str: str) -> discord.Colour:
+    # Only the parsed value is cached: every call gets its own Colour and invalid strings are always reported
+    value = _parse_color(color_str)
+    if value is None:
+        log.warning(f"Invalid color string '{color_str.strip()}', using default color (blurple).")
+        return discord.Colour.blurple()
+    return discord.Colour(value)
@@ -8,13 +8,80 @@ import discord
 from discord.ext import commands
 from discord.interactions import MISSING as MISSING
 from dismob.rate_limiter import get_rate_limiter
+from typing import Callable
+import asyncio
+import atexit
 import logging
-import os
+import logging.handlers
+import pathlib
+import queue
 
 logger: logging.Logger = None
+queue_listener: logging.handlers.QueueListener = None
 
 # --- Logging configuration ---
 
+# Log file at the root of the bot, alongside main.py
+_LOG_FILE = str(pathlib.Path(__file__).resolve().parent.parent / "bot.log")
+_LEVELS = logging.getLevelNamesMapping()
+
+# ANSI escape codes of the console output
+_BOLD = "\033[1m"
+_GRAY = "\033[90m"
+_PURPLE = "\033[35m"
+_RESET = "\033[0m"
+_LEVEL_COLORS = {
+    "DEBUG": "\033[36m",    # CYAN
+    "INFO": "\033[34m",     # Blue
+    "WARNING": "\033[33m",  # Yellow
+    "ERROR": "\033[31m",    # Red
+    "CRITICAL": "\033[41m", # Red background
+}
+
+class _ColorFilter(logging.Filter):
+    """Adds the colored level and logger names to the records, leaving their own fields untouched"""
+    # Level names padded before applying color codes, built once for all records
+    LEVEL_PREFIX = {level: f"{_BOLD}{color}{level:<8}{_RESET}" for level, color in _LEVEL_COLORS.items()}
+    NAME_CACHE: dict[str, str] = {}
+
+    def __init__(self, logger_name: str):
+        super().__init__()
+        # Most records come from the bot's own logger, its colored name is built once
+        self.logger_name = logger_name
+        self.colored_logger_name = f"{_PURPLE}{logger_name}{_RESET}"
+
+    def filter(self, record):
+        levelname, name = record.levelname, record.name
+        record.colored_level = self.LEVEL_PREFIX.get(levelname) or f"{_BOLD}{levelname:<8}{_RESET}"
+        if name == self.logger_name:
+            record.colored_name = self.colored_logger_name
+        else:
+            # Child loggers, e.g. `dismob.rate_limiter` when the bot's logger is `dismob`
+            colored_name = self.NAME_CACHE.get(name)
+            if colored_name is None:
+                colored_name = self.NAME_CACHE[name] = f"{_PURPLE}{name}{_RESET}"
+            record.colored_name = colored_name
+        return True
+
+class ColorFormatter(logging.Formatter):
+    TIME_TMPL = f"{_BOLD}{_GRAY}%s{_RESET}"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (second, formatted time) of the last record, kept together so they are always consistent
+        self._last_time: tuple[int, str] = (-1, "")
+
+    def formatTime(self, record, datefmt=None):
+        # With a datefmt the time has a one second resolution, so records of the same second share it
+        if not datefmt:
+            return self.TIME_TMPL % super().formatTime(record, datefmt)
+        ts = int(record.created)
+        last_ts, asctime = self._last_time
+        if ts != last_ts:
+            asctime = super().formatTime(record, datefmt)
+            self._last_time = (ts, asctime)
+        return self.TIME_TMPL % asctime
+
 def setup_logger(
     logger_name: str = "DungeonBot",
     file_level: str = "INFO",
@@ -24,17 +91,15 @@ def setup_logger(
     Set up and return a logger with the given name and logging levels.
     Levels should be strings like 'INFO', 'DEBUG', etc.
     """
-    LOG_FILE = os.path.abspath(os.path.join(os.path.dirname(os.path.dirname(__file__)), "bot.log"))
-    logLevels = logging.getLevelNamesMapping()
-    file_logLevel = logLevels.get(file_level.upper(), logging.INFO)
-    console_logLevel = logLevels.get(console_level.upper(), logging.INFO)
+    file_logLevel = _LEVELS.get(file_level.upper(), logging.INFO)
+    console_logLevel = _LEVELS.get(console_level.upper(), logging.INFO)
 
     global logger
     logger = logging.getLogger(logger_name)
     logger.setLevel(min(file_logLevel, console_logLevel))
 
     # File handler
-    file_handler = logging.FileHandler(LOG_FILE, encoding="utf-8")
+    file_handler = logging.FileHandler(_LOG_FILE, encoding="utf-8")
     file_handler.setLevel(file_logLevel)
     file_formatter = logging.Formatter(
         "%(asctime)s [%(levelname)-8s] %(name)s: %(message)s",
@@ -43,64 +108,139 @@ def setup_logger(
     file_handler.setFormatter(file_formatter)
 
     # Console handler
-
-    class ColorFormatter(logging.Formatter):
-        COLORS = {
-            "DEBUG": "\033[36m",    # CYAN
-            "INFO": "\033[34m",     # Blue
-            "WARNING": "\033[33m",  # Yellow
-            "ERROR": "\033[31m",    # Red
-            "CRITICAL": "\033[41m", # Red background
-        }
-        BOLD = "\033[1m"
-        PURPLE = "\033[35m"
-        RESET = "\033[0m"
-        def format(self, record):
-            levelname = record.levelname
-            # Pad the level name before applying color codes
-            padded_levelname = f"{levelname:<8}"
-            color = self.COLORS.get(levelname, "")
-            record.levelname = f"{self.BOLD}{color}{padded_levelname}{self.RESET}"
-
-            record.name = f"{self.PURPLE}{record.name}{self.RESET}"
-
-            return super().format(record)
-
-        def formatTime(self, record, datefmt=None):
-            asctime = super().formatTime(record, datefmt)
-            GRAY = "\033[90m"
-            return f"{self.BOLD}{GRAY}{asctime}{self.RESET}"
-
     console_handler = logging.StreamHandler()
     console_handler.setLevel(console_logLevel)
+    console_handler.addFilter(_ColorFilter(logger_name))
     console_formatter = ColorFormatter(
-        "%(asctime)s %(levelname)-8s %(name)s %(message)s",
+        "%(asctime)s %(colored_level)s %(colored_name)s %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S"
     )
     console_handler.setFormatter(console_formatter)
 
     # Add handlers if not already present
     if not logger.hasHandlers():
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        # The handlers run on the listener thread, so logging never waits on file or console I/O
+        global queue_listener
+        log_queue = queue.SimpleQueue()
+        queue_listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        queue_listener.start()
+        # Flush the pending records when the bot exits
+        atexit.register(queue_listener.stop)
+
+    # The logger is set up from now on: bind the logging functions to it directly, skipping the require_logger check
+    global debug, info, warning, error
+    debug = logger.debug
+    info = logger.info
+    warning = logger.warning
+    error = _logger_error
 
 # --- Client message helpers ---
 
-async def client(ctx: commands.Context | discord.Interaction, msg: str, title: str = None, color: discord.Colour = discord.Color.blurple(), delete_after: int = 5):
-    e = discord.Embed(title=title, color=color, description=msg)
-    if isinstance(ctx, commands.Context):
-        e.set_footer(text=f"Commande faites par {ctx.author.display_name}", icon_url=ctx.author.display_avatar)
+# Fixed colors and titles of the client messages, created once instead of on every message
+_BLURPLE = discord.Color.blurple()
+_GREEN = discord.Color.green()
+_RED = discord.Color.red()
+_SUCCESS_TITLE = ":white_check_mark: Success"
+_FAILURE_TITLE = ":x: Error"
+
+# Embeds sent to the same channel within this delay (in seconds) are grouped into a single message
+_COALESCE_DELAY = 0.2
+# Discord limits of the embeds of a single message
+_MAX_EMBEDS = 10
+_MAX_EMBEDS_LENGTH = 6000
+
+# Embeds waiting to be sent, with the future of their message, per (channel id, delete_after)
+_pending_embeds: dict[tuple[int, int], list[tuple[discord.Embed, asyncio.Future]]] = {}
+# Keep a reference to the running flush tasks so they aren't garbage collected
+_flush_tasks: set[asyncio.Task] = set()
+
+async def _send_embeds(channel: discord.abc.Messageable, batch: list[tuple[discord.Embed, asyncio.Future]], delete_after: int) -> None:
+    # Sent like ctx.send would, so every caller gets the send error raised
+    try:
+        message = await channel.send(embeds=[e for e, _ in batch], delete_after=delete_after)
+    except Exception as e:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(e)
+        return
+    for _, future in batch:
+        if not future.done():
+            future.set_result(message)
+
+async def _flush_embeds(channel: discord.abc.Messageable, key: tuple[int, int]) -> None:
+    """Wait for the embeds of the channel to accumulate, then send them in as few messages as Discord allows"""
+    await asyncio.sleep(_COALESCE_DELAY)
+    pending = _pending_embeds.pop(key)
+    batch: list[tuple[discord.Embed, asyncio.Future]] = []
+    length: int = 0
+    for e, future in pending:
+        size = len(e)
+        if batch and (len(batch) >= _MAX_EMBEDS or length + size > _MAX_EMBEDS_LENGTH):
+            await _send_embeds(channel, batch, key[1])
+            batch, length = [], 0
+        batch.append((e, future))
+        length += size
+    await _send_embeds(channel, batch, key[1])
+
+async def _queue_embed(channel: discord.abc.Messageable, e: discord.Embed, delete_after: int) -> discord.Message | None:
+    """Queue the embed to be sent with the other ones sent to the channel, returns the message it ends up in"""
+    key = (channel.id, delete_after)
+    future = asyncio.get_running_loop().create_future()
+    pending = _pending_embeds.get(key)
+    if pending is None:
+        pending = _pending_embeds[key] = []
+        task = asyncio.create_task(_flush_embeds(channel, key))
+        _flush_tasks.add(task)
+        task.add_done_callback(_flush_tasks.discard)
+    pending.append((e, future))
+    return await future
+
+async def _send_ctx(ctx: commands.Context, e: discord.Embed, delete_after: int):
+    e.set_footer(text=f"Commande faites par {ctx.author.display_name}", icon_url=ctx.author.display_avatar)
+    if ctx.interaction is not None:
+        # Hybrid commands invoked as slash commands answer the interaction, which can't wait
         return await ctx.send(embed=e, delete_after=delete_after)
+    return await _queue_embed(ctx.channel, e, delete_after)
+
+async def _send_interaction(interaction: discord.Interaction, e: discord.Embed, delete_after: int):
+    return await safe_respond(interaction, embed=e, ephemeral=True)
+
+# Send handler of each concrete ctx type, filled the first time a type is met
+_DISPATCH: dict[type, Callable] = {}
+
+def _resolve_handler(ctx: commands.Context | discord.Interaction) -> Callable | None:
+    """Find the send handler of the ctx type (subclasses included) and cache it for its exact type"""
+    if isinstance(ctx, commands.Context):
+        handler = _send_ctx
     elif isinstance(ctx, discord.Interaction):
-        return await safe_respond(ctx, embed=e, ephemeral=True)
+        handler = _send_interaction
+    else:
+        return None
+    _DISPATCH[type(ctx)] = handler
+    return handler
+
+async def _dispatch(ctx: commands.Context | discord.Interaction, e: discord.Embed, delete_after: int):
+    """Send an already built embed with the handler of the ctx type"""
+    handler = _DISPATCH.get(type(ctx)) or _resolve_handler(ctx)
+    if handler is not None:
+        return await handler(ctx, e, delete_after)
+
+async def client(ctx: commands.Context | discord.Interaction, msg: str, title: str = None, color: discord.Colour = _BLURPLE, delete_after: int = 5):
+    """
+    Send `msg` as an embed to the user of the command.
+    For prefix commands the embed is grouped with the other ones sent to the channel within 200ms:
+    the returned message is shared by all of them, so editing or deleting it affects the others too.
+    """
+    return await _dispatch(ctx, discord.Embed(title=title, color=color, description=msg), delete_after)
 
 async def success(ctx: commands.Context | discord.Interaction, msg: str, delete_after: int = 5):
     info(msg)
-    return await client(ctx, f"{msg}", title=":white_check_mark: Success", color=discord.Color.green(), delete_after=delete_after)
+    return await _dispatch(ctx, discord.Embed(title=_SUCCESS_TITLE, color=_GREEN, description=msg), delete_after)
     
 async def failure(ctx: commands.Context | discord.Interaction, msg: str, delete_after: int = 5, stacktrace: bool = False):
     error(msg, stacktrace)
-    return await client(ctx, f"{msg}", title=":x: Error", color=discord.Color.red(), delete_after=delete_after)
+    return await _dispatch(ctx, discord.Embed(title=_FAILURE_TITLE, color=_RED, description=msg), delete_after)
 
 # --- Logging functions ---
 def require_logger(func):
@@ -111,20 +251,24 @@ def require_logger(func):
     return wrapper
 
 @require_logger
-def debug(msg: str) -> None:
-    logger.debug(msg)
+def debug(msg: str, *args, **kwargs) -> None:
+    logger.debug(msg, *args, **kwargs)
 
 @require_logger
-def info(msg: str) -> None:
-    logger.info(msg)
+def info(msg: str, *args, **kwargs) -> None:
+    logger.info(msg, *args, **kwargs)
 
 @require_logger
-def warning(msg: str) -> None:
-    logger.warning(msg)
+def warning(msg: str, *args, **kwargs) -> None:
+    logger.warning(msg, *args, **kwargs)
 
 @require_logger
-def error(msg: str, stacktrace: bool = True) -> None:
-    logger.error(msg, stack_info=stacktrace, stacklevel=3)
+def error(msg: str, stacktrace: bool = True, *args, **kwargs) -> None:
+    logger.error(msg, *args, stack_info=stacktrace, stacklevel=3, **kwargs)
+
+def _logger_error(msg: str, stacktrace: bool = True, *args, **kwargs) -> None:
+    """`error` once the logger is set up, one frame closer to the caller"""
+    logger.error(msg, *args, stack_info=stacktrace, stacklevel=2, **kwargs)
 
 # --- Discord helpers ---
 
@@ -132,17 +276,25 @@ def missing_if_none(value):
     """Returns MISSING if value is None, else returns the value"""
     return MISSING if value is None else value
 
+def _send_kwargs(embed: discord.Embed | None, view: discord.ui.View | None, file: discord.File | None, ephemeral: bool) -> dict:
+    """Keyword arguments of an interaction send, leaving out the None ones so discord.py keeps its defaults"""
+    kwargs = {key: value for key, value in (("embed", embed), ("view", view), ("file", file)) if value is not None}
+    kwargs["ephemeral"] = ephemeral
+    return kwargs
+
 async def safe_send_message(channel: discord.TextChannel, content: str | None = None, embed: discord.Embed | None = None, view: discord.ui.View | None = None, file: discord.File | None = None) -> discord.Message | None:
     """Sends a message to a channel with rate limiting"""
+    # DM channels have no name
+    channel_name = getattr(channel, "name", channel)
     try:
         result = await get_rate_limiter().safe_send(channel, content, embed=embed, view=view, file=file)
-        info(f"Message sent in {channel.name}")
+        info("Message sent in %s", channel_name)
         return result
     except discord.Forbidden:
-        error(f"Bot has not the permission to send messages in {channel.name}")
+        error(f"Bot has not the permission to send messages in {channel_name}")
         return None
     except discord.NotFound:
-        error(f"Channel {channel.name} not found")
+        error(f"Channel {channel_name} not found")
         return None
     except Exception as e:
         error(f"Error when sending message: {e}")
@@ -152,7 +304,7 @@ async def safe_respond(interaction: discord.Interaction, content: str | None = N
     """Responds to an interaction with rate limiting"""
     try:
         return await get_rate_limiter().execute_request(
-            interaction.response.send_message(content, embed=missing_if_none(embed), view=missing_if_none(view), file=missing_if_none(file), ephemeral=ephemeral),
+            interaction.response.send_message(content, **_send_kwargs(embed, view, file, ephemeral)),
             route='POST /interactions/{interaction_id}/{interaction_token}/callback',
             major_params={'interaction_id': interaction.id}
         )
@@ -166,7 +318,7 @@ async def safe_followup(interaction: discord.Interaction, content: str | None =
     """Sends a followup message to an interaction with rate limiting"""
     try:
         return await get_rate_limiter().execute_request(
-            interaction.followup.send(content, embed=missing_if_none(embed), view=missing_if_none(view), file=missing_if_none(file), ephemeral=ephemeral),
+            interaction.followup.send(content, **_send_kwargs(embed, view, file, ephemeral)),
             route='POST /webhooks/{application_id}/{interaction_token}',
             major_params={'application_id': interaction.application_id}
         )
@@ -14,12 +14,21 @@ async def clear_views(bot: discord.Client, view_types: Type[discord.ui.View] | t
         log.warning("No view types provided to clear_views; skipping.")
         return
 
-    views_to_remove: list[discord.ui.View] = []
+    # `persistent_views` is a fresh list built by discord.py, so removing items from it has no effect:
+    # stopping a view is what unregisters it from the bot's view store
+    # Most views are instances of the exact types given, a set lookup avoids walking their MRO
+    if isinstance(view_types, type):
+        exact_types: frozenset[type] = frozenset((view_types,))
+    elif isinstance(view_types, tuple):
+        exact_types = frozenset(view_types)
+    else:
+        # e.g. a `ViewA | ViewB` union, only handled by isinstance
+        exact_types = frozenset()
+
+    removed: int = 0
     for view in bot.persistent_views:
-        if isinstance(view, view_types):
-            views_to_remove.append(view)
-            
-    for view in views_to_remove:
-        bot.persistent_views.remove(view)
+        if type(view) in exact_types or isinstance(view, view_types):
+            view.stop()
+            removed += 1
 
-    log.info(f"Removed {len(views_to_remove)} persistent views of types {view_types}")
+    log.info("Removed %d persistent views of types %s", removed, view_types)